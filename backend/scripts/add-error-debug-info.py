@@ -5,13 +5,29 @@ Add debug info attachment to all error responses in Puppetserver routes
 
 import re
 
-def add_debug_to_catch_block(content):
-    """Add debug info collection at the start of catch blocks"""
-
-    # Pattern: } catch (error) { followed by const duration
-    pattern = r'(\} catch \(error\) \{\s*const duration = Date\.now\(\) - startTime;)'
-
-    replacement = r'''\1
+from atomic_write import write_text_atomic
+from debug_snippets import NOT_CONFIGURED_DEBUG
+
+# Pattern: res.status(XXX).json({ error: { ... } });
+_ERR_JSON_RE = re.compile(
+    r'res\.status\((?P<status>\d+)\)\.json\(\{\s*error: \{(?P<error>[^}]+)\}\s*\}\);',
+    re.DOTALL,
+)
+
+# Pattern for early returns (not configured, not initialized)
+# Status code and error object are captured directly for the replacement
+_EARLY_RETURN_RE = re.compile(
+    r'(?P<condition>if \(!puppetserverService\) \{[^}]+logger\.warn[^}]+\})\s*res\.status\((?P<early_status>\d+)\)\.json\(\{(?P<early_error>[^}]+)\}\);',
+    re.DOTALL,
+)
+
+# Catch block: "} catch (error) {", whitespace, then the duration line.
+# It is all literal text, so it is located with str.find rather than a regex
+_CATCH_HEAD = '} catch (error) {'
+_CATCH_TAIL = 'const duration = Date.now() - startTime;'
+_CATCH_DONE = 'if (debugInfo) {'
+
+_CATCH_DEBUG = '''
 
         if (debugInfo) {
           debugInfo.duration = duration;
@@ -24,56 +40,23 @@ def add_debug_to_catch_block(content):
           debugInfo.context = expertModeService.collectRequestContext(req);
         }'''
 
-    return re.sub(pattern, replacement, content)
+def _emit_err(match):
+    status_code = match.group('status')
+    error_content = match.group('error')
 
-def add_debug_to_error_responses(content):
-    """Add debug info attachment to all error JSON responses"""
-
-    # Pattern: res.status(XXX).json({ error: { ... } });
-    # We need to wrap the error object and attach debug info
-    pattern = r'res\.status\((\d+)\)\.json\(\{\s*error: \{([^}]+)\}\s*\}\);'
-
-    def replacement(match):
-        status_code = match.group(1)
-        error_content = match.group(2)
-
-        return f'''const errorResponse = {{
+    return f'''const errorResponse = {{
           error: {{{error_content}}}
         }};
         res.status({status_code}).json(
           debugInfo ? expertModeService.attachDebugInfo(errorResponse, debugInfo) : errorResponse
         );'''
 
-    return re.sub(pattern, replacement, content, flags=re.DOTALL)
+def _emit_early(match):
+    condition_block = match.group('condition')
+    status_code = match.group('early_status')
+    error_content = match.group('early_error')
 
-def add_debug_to_early_returns(content):
-    """Add debug info to early return error responses (before try block)"""
-
-    # Pattern for early returns (not configured, not initialized)
-    # These happen before the try block, so we need to add debug info collection there too
-    pattern = r'(if \(!puppetserverService\) \{[^}]+logger\.warn[^}]+\})\s*(res\.status\(\d+\)\.json\(\{[^}]+\}\);)'
-
-    def replacement(match):
-        condition_block = match.group(1)
-        response = match.group(2)
-
-        # Extract status code and error object
-        status_match = re.search(r'res\.status\((\d+)\)\.json\(\{([^}]+)\}\);', response)
-        if status_match:
-            status_code = status_match.group(1)
-            error_content = status_match.group(2)
-
-            return f'''{condition_block}
-
-        if (debugInfo) {{
-          debugInfo.duration = Date.now() - startTime;
-          expertModeService.addWarning(debugInfo, {{
-            message: "Puppetserver integration is not configured",
-            level: 'warn',
-          }});
-          debugInfo.performance = expertModeService.collectPerformanceMetrics();
-          debugInfo.context = expertModeService.collectRequestContext(req);
-        }}
+    return f'''{condition_block}{NOT_CONFIGURED_DEBUG}
 
         const errorResponse = {{
           {error_content}
@@ -82,9 +65,66 @@ def add_debug_to_early_returns(content):
           debugInfo ? expertModeService.attachDebugInfo(errorResponse, debugInfo) : errorResponse
         );'''
 
-        return match.group(0)  # Return unchanged if pattern doesn't match
+def _catch_patches(content):
+    """Yield (start, end, replacement) insertions after each catch block duration line"""
+    start = 0
+    while True:
+        i = content.find(_CATCH_HEAD, start)
+        if i == -1:
+            return
+
+        j = i + len(_CATCH_HEAD)
+        while j < len(content) and content[j].isspace():
+            j += 1
+
+        if content.startswith(_CATCH_TAIL, j):
+            end = j + len(_CATCH_TAIL)
+            k = end
+            while k < len(content) and content[k].isspace():
+                k += 1
+
+            # Skip catch blocks that already collect debug info
+            if not content.startswith(_CATCH_DONE, k):
+                yield end, end, _CATCH_DEBUG
+        start = j
+
+def _apply_patches(content, patches):
+    """Emit content with non-overlapping (start, end, replacement) patches applied"""
+    out = []
+    pos = 0
+    for start, end, replacement in sorted(patches, key=lambda patch: patch[:2]):
+        out.append(content[pos:start])
+        out.append(replacement)
+        pos = end
+    out.append(content[pos:])
+
+    return ''.join(out)
+
+def add_debug_to_catch_block(content):
+    """Add debug info collection at the start of catch blocks"""
+    return _apply_patches(content, _catch_patches(content))
 
-    return re.sub(pattern, replacement, content, flags=re.DOTALL)
+def add_debug_to_error_responses(content):
+    """Add debug info attachment to all error JSON responses"""
+    # We need to wrap the error object and attach debug info
+    return _ERR_JSON_RE.sub(_emit_err, content)
+
+def add_debug_to_early_returns(content):
+    """Add debug info to early return error responses (before try block)"""
+    # These happen before the try block, so we need to add debug info collection there too
+    return _EARLY_RETURN_RE.sub(_emit_early, content)
+
+def add_debug_info(content):
+    """Add debug info to catch blocks and error responses, building the output once"""
+    patches = list(_catch_patches(content))
+    patches.extend((m.start(), m.end(), _emit_err(m)) for m in _ERR_JSON_RE.finditer(content))
+
+    return _apply_patches(content, patches)
+
+def transform(content):
+    """Apply this script's changes to the routes file content"""
+    # Add debug info to catch blocks and error responses
+    return add_debug_info(content)
 
 def main():
     file_path = 'backend/src/routes/integrations/puppetserver.ts'
@@ -92,14 +132,9 @@ def main():
     with open(file_path, 'r') as f:
         content = f.read()
 
-    # Add debug info to catch blocks
-    content = add_debug_to_catch_block(content)
-
-    # Add debug info to error responses
-    content = add_debug_to_error_responses(content)
+    content = transform(content)
 
-    with open(file_path, 'w') as f:
-        f.write(content)
+    write_text_atomic(file_path, content)
 
     print('✓ Added debug info to error responses')
 
@@ -4,14 +4,36 @@ Add expert mode initialization to all Puppetserver routes
 """
 
 import re
+from bisect import bisect_left
+
+from atomic_write import write_text_atomic
+
+# Pattern to find routes that don't have debugInfo yet
+# Look for "const startTime = Date.now();" NOT followed by "const expertModeService"
+_INIT_RE = re.compile(r'(const startTime = Date\.now\(\);)\s*\n\s*\n\s*(logger\.info\()')
+
+# Route literal -> operation name used for OPERATION_PLACEHOLDER
+_ROUTE_MAP = {
+    '"/nodes/:certname/status"': 'GET /api/integrations/puppetserver/nodes/:certname/status',
+    '"/nodes/:certname/facts"': 'GET /api/integrations/puppetserver/nodes/:certname/facts',
+    '"/catalog/:certname/:environment"': 'GET /api/integrations/puppetserver/catalog/:certname/:environment',
+    '"/catalog/compare"': 'POST /api/integrations/puppetserver/catalog/compare',
+    '"/environments"': 'GET /api/integrations/puppetserver/environments',
+    '"/environments/:name"': 'GET /api/integrations/puppetserver/environments/:name',
+    '"/environments/:name/deploy"': 'POST /api/integrations/puppetserver/environments/:name/deploy',
+    '"/environments/:name/cache"': 'DELETE /api/integrations/puppetserver/environments/:name/cache',
+    '"/status/services"': 'GET /api/integrations/puppetserver/status/services',
+    '"/status/simple"': 'GET /api/integrations/puppetserver/status/simple',
+    '"/admin-api"': 'GET /api/integrations/puppetserver/admin-api',
+    '"/metrics"': 'GET /api/integrations/puppetserver/metrics',
+}
+
+_ROUTE_DECL = re.compile(r'router\.(get|post|delete)\(\s*("[^"]+")')
+_PLACEHOLDER = re.compile(r'OPERATION_PLACEHOLDER')
 
 def add_expert_mode_init(content):
     """Add expert mode initialization after startTime declaration"""
 
-    # Pattern to find routes that don't have debugInfo yet
-    # Look for "const startTime = Date.now();" NOT followed by "const expertModeService"
-    pattern = r'(const startTime = Date\.now\(\);)\s*\n\s*\n\s*(logger\.info\()'
-
     replacement = r'''\1
       const expertModeService = new ExpertModeService();
       const requestId = req.id ?? expertModeService.generateRequestId();
@@ -27,36 +49,42 @@ def add_expert_mode_init(content):
 
       \2'''
 
-    return re.sub(pattern, replacement, content)
+    return _INIT_RE.sub(replacement, content)
 
 def fix_operation_names(content):
     """Fix operation placeholder names based on route context"""
     # This is a simple heuristic - look for the route definition above
-    routes = [
-        ('"/nodes/:certname/status"', 'GET /api/integrations/puppetserver/nodes/:certname/status'),
-        ('"/nodes/:certname/facts"', 'GET /api/integrations/puppetserver/nodes/:certname/facts'),
-        ('"/catalog/:certname/:environment"', 'GET /api/integrations/puppetserver/catalog/:certname/:environment'),
-        ('"/catalog/compare"', 'POST /api/integrations/puppetserver/catalog/compare'),
-        ('"/environments"', 'GET /api/integrations/puppetserver/environments'),
-        ('"/environments/:name"', 'GET /api/integrations/puppetserver/environments/:name'),
-        ('"/environments/:name/deploy"', 'POST /api/integrations/puppetserver/environments/:name/deploy'),
-        ('"/environments/:name/cache"', 'DELETE /api/integrations/puppetserver/environments/:name/cache'),
-        ('"/status/services"', 'GET /api/integrations/puppetserver/status/services'),
-        ('"/status/simple"', 'GET /api/integrations/puppetserver/status/simple'),
-        ('"/admin-api"', 'GET /api/integrations/puppetserver/admin-api'),
-        ('"/metrics"', 'GET /api/integrations/puppetserver/metrics'),
-    ]
-
-    for route_pattern, operation_name in routes:
-        # Find OPERATION_PLACEHOLDER after this route
-        pattern = f'router\\.(get|post|delete)\\(\s*{re.escape(route_pattern)}.*?OPERATION_PLACEHOLDER'
-
-        def replace_op(match):
-            return match.group(0).replace('OPERATION_PLACEHOLDER', operation_name)
-
-        content = re.sub(pattern, replace_op, content, flags=re.DOTALL)
-
-    return content
+    # Walk route declarations in order and patch the next placeholder after each
+    placeholders = [m.start() for m in _PLACEHOLDER.finditer(content)]
+    if not placeholders:
+        return content
+
+    width = len('OPERATION_PLACEHOLDER')
+    out = []
+    pos = 0
+    for match in _ROUTE_DECL.finditer(content):
+        operation_name = _ROUTE_MAP.get(match.group(2))
+        if operation_name is None:
+            continue
+
+        i = bisect_left(placeholders, max(match.end(), pos))
+        if i == len(placeholders):
+            break
+
+        out.append(content[pos:placeholders[i]])
+        out.append(operation_name)
+        pos = placeholders[i] + width
+    out.append(content[pos:])
+
+    return ''.join(out)
+
+def transform(content):
+    """Apply this script's changes to the routes file content"""
+    # Add expert mode initialization
+    content = add_expert_mode_init(content)
+
+    # Fix operation names
+    return fix_operation_names(content)
 
 def main():
     file_path = 'backend/src/routes/integrations/puppetserver.ts'
@@ -64,14 +92,9 @@ def main():
     with open(file_path, 'r') as f:
         content = f.read()
 
-    # Add expert mode initialization
-    content = add_expert_mode_init(content)
-
-    # Fix operation names
-    content = fix_operation_names(content)
+    content = transform(content)
 
-    with open(file_path, 'w') as f:
-        f.write(content)
+    write_text_atomic(file_path, content)
 
     print('✓ Added expert mode initialization to routes')
 
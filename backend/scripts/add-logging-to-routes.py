@@ -7,6 +7,44 @@ This script adds the standard logging pattern to all routes that don't have it y
 import re
 import sys
 
+_ASYNC_HANDLER_RE = re.compile(r'asyncHandler\(async \([^)]+\): Promise<void> => \{')
+
+# Catch blocks that need a duration, and console.* calls to route through logger
+_REWRITE_RE = re.compile(r'(?P<catch>catch \(error\) \{)|console\.(?P<console>error|warn|log)\(')
+_CONSOLE_TO_LOGGER = {'error': 'error', 'warn': 'warn', 'log': 'info'}
+
+# Find all route definitions
+_ROUTE_RE = re.compile(r'router\.(get|post|delete)\(\s*"([^"]+)"')
+
+def _init_snippet(method, endpoint, integration, operation):
+    """Build the logging initialization code for the start of a handler"""
+    logging_init = f'''
+      const startTime = Date.now();
+
+      logger.info("{method.upper()} {endpoint}", {{
+        component: "IntegrationsRouter",'''
+
+    if integration:
+        logging_init += f'''
+        integration: "{integration}",'''
+
+    logging_init += f'''
+        operation: "{operation}",
+      }});
+      '''
+
+    return logging_init
+
+def _rewrite(match):
+    if match.group('catch'):
+        # Add error logging to catch blocks
+        return f'''{match.group('catch')}
+        const duration = Date.now() - startTime;
+        '''
+
+    # Replace console.error with logger.error, and so on
+    return f"logger.{_CONSOLE_TO_LOGGER[match.group('console')]}("
+
 def add_logging_to_route(route_content, method, endpoint, integration=None):
     """Add logging statements to a route handler"""
 
@@ -28,50 +66,25 @@ def add_logging_to_route(route_content, method, endpoint, integration=None):
         return route_content
 
     # Find the start of the function body (after the opening brace)
-    match = re.search(r'asyncHandler\(async \([^)]+\): Promise<void> => \{', route_content)
+    match = _ASYNC_HANDLER_RE.search(route_content)
     if not match:
         return route_content
 
+    # Collect (start, end, replacement) patches, then emit the result once
     insert_pos = match.end()
+    patches = [(insert_pos, insert_pos, _init_snippet(method, endpoint, integration, operation))]
+    patches.extend((m.start(), m.end(), _rewrite(m)) for m in _REWRITE_RE.finditer(route_content))
+    patches.sort(key=lambda patch: patch[:2])
 
-    # Build the logging initialization code
-    logging_init = f'''
-      const startTime = Date.now();
-
-      logger.info("{method.upper()} {endpoint}", {{
-        component: "IntegrationsRouter",'''
-
-    if integration:
-        logging_init += f'''
-        integration: "{integration}",'''
-
-    logging_init += f'''
-        operation: "{operation}",
-      }});
-      '''
+    out = []
+    pos = 0
+    for start, end, replacement in patches:
+        out.append(route_content[pos:start])
+        out.append(replacement)
+        pos = end
+    out.append(route_content[pos:])
 
-    # Insert the logging initialization
-    new_content = route_content[:insert_pos] + logging_init + route_content[insert_pos:]
-
-    # Add error logging to catch blocks
-    # Find all catch blocks and add logging
-    catch_pattern = r'(catch \(error\) \{)'
-
-    def add_error_logging(match):
-        catch_start = match.group(1)
-        error_log = f'''{catch_start}
-        const duration = Date.now() - startTime;
-        '''
-        return error_log
-
-    new_content = re.sub(catch_pattern, add_error_logging, new_content)
-
-    # Replace console.error with logger.error
-    new_content = new_content.replace('console.error(', 'logger.error(')
-    new_content = new_content.replace('console.warn(', 'logger.warn(')
-    new_content = new_content.replace('console.log(', 'logger.info(')
-
-    return new_content
+    return ''.join(out)
 
 def main():
     file_path = 'backend/src/routes/integrations.ts'
@@ -83,13 +96,10 @@ def main():
         print(f"Error: Could not find {file_path}")
         sys.exit(1)
 
-    # Find all route definitions
-    route_pattern = r'router\.(get|post|delete)\(\s*"([^"]+)"'
-
     routes_found = 0
     routes_updated = 0
 
-    for match in re.finditer(route_pattern, content):
+    for match in _ROUTE_RE.finditer(content):
         method = match.group(1)
         endpoint = match.group(2)
         routes_found += 1
@@ -0,0 +1,32 @@
+"""
+Atomic file writes shared by the route transform scripts
+"""
+
+import os
+
+def write_text_atomic(file_path, content):
+    """Write content to file_path via a temp file and os.replace, so readers never see a partial file"""
+    data = memoryview(content.encode('utf-8'))
+    tmp_path = f'{file_path}.tmp.{os.getpid()}'
+
+    # Keep the permissions of the file being replaced
+    try:
+        mode = os.stat(file_path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+    try:
+        try:
+            # os.write may write less than asked for, so loop until done
+            while data:
+                written = os.write(fd, data)
+                data = data[written:]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,20 @@
+"""
+TypeScript debug info snippets shared by the route transform scripts
+"""
+
+def _warning_debug(message):
+    return f'''
+
+        if (debugInfo) {{
+          debugInfo.duration = Date.now() - startTime;
+          expertModeService.addWarning(debugInfo, {{
+            message: "{message}",
+            level: 'warn',
+          }});
+          debugInfo.performance = expertModeService.collectPerformanceMetrics();
+          debugInfo.context = expertModeService.collectRequestContext(req);
+        }}'''
+
+# Debug info collection for early returns, inserted after the guarding if block
+NOT_CONFIGURED_DEBUG = _warning_debug('Puppetserver integration is not configured')
+NOT_INITIALIZED_DEBUG = _warning_debug('Puppetserver integration is not initialized')
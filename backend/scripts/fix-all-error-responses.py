@@ -3,78 +3,68 @@
 Fix all remaining error responses to attach debug info
 """
 
+import functools
 import re
 
-def fix_error_responses(content):
-    """Transform all res.status().json({ error: {...} }); to use errorResponse pattern"""
-
-    # Pattern to match error responses with various formatting
-    # This matches: res.status(XXX).json({ \n error: { \n ... \n } \n });
-    pattern = r'res\.status\((\d+)\)\.json\(\{\s*error:\s*\{([^}]+(?:\{[^}]*\}[^}]*)*)\}\s*\}\);'
-
-    def replacement(match):
-        status_code = match.group(1)
-        error_content = match.group(2).strip()
-
-        # Clean up the error content - remove extra whitespace but preserve structure
-        error_content = re.sub(r'\s+', ' ', error_content)
-        error_content = error_content.replace(' ,', ',')
-
-        return f'''const errorResponse = {{
+from atomic_write import write_text_atomic
+from debug_snippets import NOT_CONFIGURED_DEBUG, NOT_INITIALIZED_DEBUG
+
+# Pattern to match error responses with various formatting
+# This matches: res.status(XXX).json({ \n error: { \n ... \n } \n });
+# The error body allows one level of nested braces. Possessive quantifiers
+# (Python 3.11+) keep a failed match from backtracking into the body.
+_ERR_JSON_RE = re.compile(
+    r'res\.status\((\d+)\)\.json\(\{\s*error:\s*\{([^{}]++(?:\{[^{}]*+\}[^{}]*+)*+)\}\s*\}\);',
+    re.DOTALL,
+)
+_WS_RE = re.compile(r'\s+')
+
+# Pattern for "not configured" errors before try block
+_NOT_CONFIGURED_RE = re.compile(r'(if \(!puppetserverService\) \{[^}]*logger\.warn[^}]*\})\s*res\.status')
+
+# Pattern for "not initialized" errors before try block
+_NOT_INITIALIZED_RE = re.compile(
+    r'(if \(!puppetserverService\.isInitialized\(\)\) \{[^}]*logger\.warn[^}]*\})\s*res\.status'
+)
+
+# Replacement text following the matched condition block, built once
+_NOT_CONFIGURED_TAIL = NOT_CONFIGURED_DEBUG + '\n\n        res.status'
+_NOT_INITIALIZED_TAIL = NOT_INITIALIZED_DEBUG + '\n\n        res.status'
+
+@functools.lru_cache(maxsize=1024)
+def _render_error_response(status_code, error_content):
+    """Render one errorResponse block; identical error responses repeat across routes"""
+    error_content = error_content.strip()
+
+    # Clean up the error content - remove extra whitespace but preserve structure
+    error_content = _WS_RE.sub(' ', error_content)
+    error_content = error_content.replace(' ,', ',')
+
+    return f'''const errorResponse = {{
           error: {{ {error_content} }}
         }};
         res.status({status_code}).json(
           debugInfo ? expertModeService.attachDebugInfo(errorResponse, debugInfo) : errorResponse
         );'''
 
-    return re.sub(pattern, replacement, content, flags=re.DOTALL)
+def fix_error_responses(content):
+    """Transform all res.status().json({ error: {...} }); to use errorResponse pattern"""
+    return _ERR_JSON_RE.sub(lambda match: _render_error_response(match.group(1), match.group(2)), content)
 
 def add_debug_to_early_returns(content):
     """Add debug info collection to early return errors (not configured, not initialized)"""
+    content = _NOT_CONFIGURED_RE.sub(lambda match: match.group(1) + _NOT_CONFIGURED_TAIL, content)
+    content = _NOT_INITIALIZED_RE.sub(lambda match: match.group(1) + _NOT_INITIALIZED_TAIL, content)
 
-    # Pattern for "not configured" errors before try block
-    pattern1 = r'(if \(!puppetserverService\) \{[^}]*logger\.warn[^}]*\})\s*res\.status'
-
-    def add_debug_collection(match):
-        condition = match.group(1)
-        return f'''{condition}
-
-        if (debugInfo) {{
-          debugInfo.duration = Date.now() - startTime;
-          expertModeService.addWarning(debugInfo, {{
-            message: "Puppetserver integration is not configured",
-            level: 'warn',
-          }});
-          debugInfo.performance = expertModeService.collectPerformanceMetrics();
-          debugInfo.context = expertModeService.collectRequestContext(req);
-        }}
-
-        res.status'''
-
-    content = re.sub(pattern1, add_debug_collection, content)
-
-    # Pattern for "not initialized" errors before try block
-    pattern2 = r'(if \(!puppetserverService\.isInitialized\(\)\) \{[^}]*logger\.warn[^}]*\})\s*res\.status'
-
-    def add_debug_collection2(match):
-        condition = match.group(1)
-        return f'''{condition}
-
-        if (debugInfo) {{
-          debugInfo.duration = Date.now() - startTime;
-          expertModeService.addWarning(debugInfo, {{
-            message: "Puppetserver integration is not initialized",
-            level: 'warn',
-          }});
-          debugInfo.performance = expertModeService.collectPerformanceMetrics();
-          debugInfo.context = expertModeService.collectRequestContext(req);
-        }}
-
-        res.status'''
+    return content
 
-    content = re.sub(pattern2, add_debug_collection2, content)
+def transform(content):
+    """Apply this script's changes to the routes file content"""
+    # Fix all error responses
+    content = fix_error_responses(content)
 
-    return content
+    # Add debug info to early returns
+    return add_debug_to_early_returns(content)
 
 def main():
     file_path = 'backend/src/routes/integrations/puppetserver.ts'
@@ -82,14 +72,9 @@ def main():
     with open(file_path, 'r') as f:
         content = f.read()
 
-    # Fix all error responses
-    content = fix_error_responses(content)
-
-    # Add debug info to early returns
-    content = add_debug_to_early_returns(content)
+    content = transform(content)
 
-    with open(file_path, 'w') as f:
-        f.write(content)
+    write_text_atomic(file_path, content)
 
     print('✓ Fixed all error responses')
 
@@ -2,38 +2,61 @@
 """
 Script to fix common TypeScript lint errors
 """
+import mmap
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Pattern: ${someVar.length} -> ${String(someVar.length)}
+# and ${count} (or total, size, ...) -> ${String(count)}
+_TPL_PAT = re.compile(r'\$\{([^}]+\.length|count|total|size|index|page|limit|offset)\}')
+
+# Only fix obvious cases like: something || 0, something || ''
+# The right operand is only looked ahead at, so chains like a || 0 || "" are all rewritten
+_NC_PAT = re.compile(r'(\w+)\s*\|\|\s*(?=0\b|""|\'\')')
+
 def fix_template_literals(content: str) -> str:
     """Fix template literal expressions with numbers"""
     # This is a simplified approach - wraps common patterns
-    # Pattern: ${someVar.length} -> ${String(someVar.length)}
-    patterns = [
-        (r'\$\{([^}]+\.length)\}', r'${String(\1)}'),
-        (r'\$\{(count|total|size|index|page|limit|offset)\}', r'${String(\1)}'),
-    ]
-
-    for pattern, replacement in patterns:
-        content = re.sub(pattern, replacement, content)
-
-    return content
+    return _TPL_PAT.sub(r'${String(\1)}', content)
 
 def fix_nullish_coalescing(content: str) -> str:
     """Fix || to ?? where appropriate"""
     # This is context-sensitive, so we'll be conservative
-    # Only fix obvious cases like: something || 0, something || ''
-    patterns = [
-        (r'(\w+)\s*\|\|\s*0\b', r'\1 ?? 0'),
-        (r'(\w+)\s*\|\|\s*""', r'\1 ?? ""'),
-        (r'(\w+)\s*\|\|\s*\'\'', r'\1 ?? \'\''),
-    ]
+    return _NC_PAT.sub(r'\1 ?? ', content)
 
-    for pattern, replacement in patterns:
-        content = re.sub(pattern, replacement, content)
+def _process(ts_file: Path) -> tuple[Path, bool, str | None]:
+    """Apply fixes to a single file, returning whether anything changed"""
+    try:
+        # Map the file and look for the fix markers before decoding anything;
+        # most files need no changes and never get turned into a str
+        if ts_file.stat().st_size == 0:
+            # mmap cannot map an empty file
+            return ts_file, False, None
+        with open(ts_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # mmap's `in` only tests single bytes, so use find()
+                needs_tpl = mm.find(b'${') != -1
+                needs_nc = mm.find(b'||') != -1
+                if not (needs_tpl or needs_nc):
+                    return ts_file, False, None
+                content = mm[:].decode('utf-8')
+        original = content
 
-    return content
+        # Apply fixes, skipping the regex passes when their marker is absent
+        if needs_tpl:
+            content = fix_template_literals(content)
+        if needs_nc:
+            content = fix_nullish_coalescing(content)
+
+        changed = content != original
+        # Uncomment to actually write changes:
+        # if changed:
+        #     ts_file.write_text(content)
+        return ts_file, changed, None
+    except Exception as e:
+        return ts_file, False, str(e)
 
 def main():
     backend_src = Path('backend/src')
@@ -49,21 +72,13 @@ def main():
     print("Note: This script makes conservative fixes.")
     print("Manual review is still required for complex cases.\n")
 
-    for ts_file in ts_files:
-        try:
-            content = ts_file.read_text()
-            original = content
-
-            # Apply fixes
-            content = fix_template_literals(content)
-            content = fix_nullish_coalescing(content)
-
-            if content != original:
+    # Files are independent, so scan them across all cores
+    with ProcessPoolExecutor() as executor:
+        for ts_file, changed, error in executor.map(_process, ts_files, chunksize=16):
+            if error is not None:
+                print(f"Error processing {ts_file}: {error}")
+            elif changed:
                 print(f"Fixed: {ts_file.relative_to(backend_src.parent)}")
-                # Uncomment to actually write changes:
-                # ts_file.write_text(content)
-        except Exception as e:
-            print(f"Error processing {ts_file}: {e}")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Apply all Puppetserver route transforms with a single read and write of the routes file
+"""
+
+import importlib.util
+from pathlib import Path
+
+from atomic_write import write_text_atomic
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Transform scripts in the order they are applied to the routes file
+STAGES = [
+    'transform-expert-mode.py',
+    'add-expert-mode-init.py',
+    'add-error-debug-info.py',
+    'fix-all-error-responses.py',
+]
+
+def _load_transform(script_name):
+    """Import a hyphen-named sibling script and return its transform()"""
+    module_name = script_name.removesuffix('.py').replace('-', '_')
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPTS_DIR / script_name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.transform
+
+PIPELINE = [_load_transform(script_name) for script_name in STAGES]
+
+def main():
+    file_path = Path('backend/src/routes/integrations/puppetserver.ts')
+
+    content = file_path.read_text()
+
+    for transform in PIPELINE:
+        content = transform(content)
+
+    write_text_atomic(file_path, content)
+
+    print(f'✓ Applied {len(PIPELINE)} transforms to {file_path}')
+
+if __name__ == '__main__':
+    main()
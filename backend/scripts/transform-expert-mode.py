@@ -6,48 +6,49 @@ Transform Puppetserver routes to use proper expert mode pattern
 import re
 import sys
 
-def transform_handle_expert_mode_response(content):
-    """Replace handleExpertModeResponse with full pattern"""
-    # Pattern to match handleExpertModeResponse calls - more flexible
-    pattern = r'handleExpertModeResponse\s*\(\s*req,\s*res,\s*responseData,\s*\'([^\']+)\',\s*duration,\s*\'([^\']+)\',\s*\{([^}]*)\}\s*\);'
+from atomic_write import write_text_atomic
 
-    def replacement(match):
-        operation = match.group(1)
-        integration = match.group(2)
-        metadata = match.group(3).strip()
+# Pattern to match handleExpertModeResponse calls - more flexible
+_HANDLE_EXPERT_RE = re.compile(
+    r'handleExpertModeResponse\s*\(\s*req,\s*res,\s*responseData,\s*\'([^\']+)\',\s*duration,\s*\'([^\']+)\',\s*\{([^}]*)\}\s*\);'
+)
+_HANDLE_EXPERT_IMPORT_RE = re.compile(r'handleExpertModeResponse,\s*')
 
-        result = '''if (debugInfo) {
+# Fixed parts of the expanded handleExpertModeResponse call
+_RESPONSE_HEAD = '''if (debugInfo) {
           debugInfo.duration = duration;'''
-
-        if metadata:
-            # Parse metadata key: value
-            parts = metadata.split(':')
-            if len(parts) == 2:
-                key = parts[0].strip()
-                value = parts[1].strip()
-                result += f'''
-          expertModeService.addMetadata(debugInfo, '{key}', {value});'''
-
-        result += '''
+_RESPONSE_TAIL = '''
           debugInfo.performance = expertModeService.collectPerformanceMetrics();
           debugInfo.context = expertModeService.collectRequestContext(req);
           res.json(expertModeService.attachDebugInfo(responseData, debugInfo));
         } else {
           res.json(responseData);
         }'''
+_RESPONSE_NO_META = _RESPONSE_HEAD + _RESPONSE_TAIL
 
-        return result
+def _expand_expert_mode_response(match):
+    metadata = match.group(3).strip()
 
-    return re.sub(pattern, replacement, content)
+    # Parse metadata key: value
+    if metadata.count(':') != 1:
+        return _RESPONSE_NO_META
 
-def main():
-    file_path = 'backend/src/routes/integrations/puppetserver.ts'
+    key, _, value = metadata.partition(':')
+    return f'''{_RESPONSE_HEAD}
+          expertModeService.addMetadata(debugInfo, '{key.strip()}', {value.strip()});{_RESPONSE_TAIL}'''
 
-    with open(file_path, 'r') as f:
-        content = f.read()
+def transform_handle_expert_mode_response(content):
+    """Replace handleExpertModeResponse with full pattern"""
+    # Already transformed (e.g. on a re-run), nothing to scan for
+    if 'handleExpertModeResponse' not in content:
+        return content
+
+    return _HANDLE_EXPERT_RE.sub(_expand_expert_mode_response, content)
 
+def transform(content):
+    """Apply this script's changes to the routes file content"""
     # Remove handleExpertModeResponse from imports
-    content = re.sub(r'handleExpertModeResponse,\s*', '', content)
+    content = _HANDLE_EXPERT_IMPORT_RE.sub('', content)
 
     # Add ExpertModeService import if not present
     if 'import { ExpertModeService }' not in content:
@@ -57,10 +58,17 @@ def main():
         )
 
     # Transform handleExpertModeResponse calls
-    content = transform_handle_expert_mode_response(content)
+    return transform_handle_expert_mode_response(content)
+
+def main():
+    file_path = 'backend/src/routes/integrations/puppetserver.ts'
+
+    with open(file_path, 'r') as f:
+        content = f.read()
+
+    content = transform(content)
 
-    with open(file_path, 'w') as f:
-        f.write(content)
+    write_text_atomic(file_path, content)
 
     print('✓ Transformed Puppetserver routes')
 